@@ -1,33 +1,205 @@
 """GitHub API related utilities."""
 
+import os
+import time
+from typing import Any
+
 import httpx
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ETAG_CACHE_SIZE = 512  # Max GitHub responses kept for revalidation
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+USERNAME_TTL = 3600  # Seconds to reuse the authenticated username
+
+# Read once at startup; the token does not change while the process runs
+_GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+_GH_HEADERS = {"Accept": "application/vnd.github+json"}
+if _GITHUB_TOKEN:
+    _GH_HEADERS["Authorization"] = f"Bearer {_GITHUB_TOKEN}"
 
 
 def get_headers() -> dict[str, str]:
     """
     Get headers for GitHub API requests, using authentication if available.
 
-    Only read-only access with no authentication token is supported for now.
+    The GITHUB_TOKEN environment variable is sent as a bearer token when set.
+    Only read-only access is supported for now.
 
     Returns:
         dict: Headers for GitHub API requests.
     """
-    return {"Accept": "application/vnd.github+json"}
+    return dict(_GH_HEADERS)
+
+
+# Shared client so GitHub requests reuse pooled keep-alive (HTTP/2) connections
+GITHUB_HTTP = httpx.Client(
+    http2=True,
+    headers=_GH_HEADERS,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=10.0,
+)
+GITHUB_HTTP_ASYNC = httpx.AsyncClient(
+    http2=True,
+    headers=_GH_HEADERS,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=10.0,
+)
+
+# Last ETag and body per GitHub URL, replayed when GitHub answers 304 Not Modified
+_etag_cache: dict[str, tuple[str, bytes]] = {}
+
+
+def _build_conditional_request(
+    client: httpx.Client | httpx.AsyncClient, url: str, params: Any
+) -> tuple[httpx.Request, bytes | None]:
+    """Build a GET request carrying If-None-Match when the URL has a cached ETag.
+
+    The cached body is returned with the request, so a 304 can still be answered
+    if the entry is evicted while the request is in flight.
+
+    Args:
+        client (httpx.Client | httpx.AsyncClient): The client that will send the request.
+        url (str): The GitHub API URL.
+        params (Any): Query parameters for the request.
+
+    Returns:
+        tuple[httpx.Request, bytes | None]: The prepared request and the cached body it revalidates, if any.
+    """
+    request = client.build_request("GET", url, params=params)
+    cached = _etag_cache.get(str(request.url))
+    if not cached:
+        return request, None
+    request.headers["If-None-Match"] = cached[0]
+    return request, cached[1]
+
+
+def _use_cached_body(response: httpx.Response, cached_body: bytes | None) -> httpx.Response:
+    """Resolve a 304 with the revalidated body, or store a fresh response's ETag and body.
+
+    Args:
+        response (httpx.Response): The response to a conditional request.
+        cached_body (bytes | None): The body the request revalidated, if any.
+
+    Returns:
+        httpx.Response: The response, with the cached body substituted on a 304.
+    """
+    if response.status_code == httpx.codes.NOT_MODIFIED and cached_body is not None:
+        return httpx.Response(httpx.codes.OK, content=cached_body, request=response.request)
+
+    key = str(response.request.url)
+    etag = response.headers.get("ETag")
+    if response.is_success and etag:
+        if key not in _etag_cache and len(_etag_cache) >= ETAG_CACHE_SIZE:
+            _etag_cache.pop(next(iter(_etag_cache)), None)
+        _etag_cache[key] = (etag, response.content)
+    return response
+
+
+def github_get(url: str, params: Any = None) -> httpx.Response:
+    """GET a GitHub API URL, revalidating any cached copy with its ETag.
+
+    Unchanged resources come back as 304 Not Modified, which skips the body
+    transfer and does not count against the primary rate limit.
+
+    Args:
+        url (str): The GitHub API URL.
+        params (Any): Optional query parameters.
+
+    Returns:
+        httpx.Response: The response.
+    """
+    request, cached_body = _build_conditional_request(GITHUB_HTTP, url, params)
+    response = GITHUB_HTTP.send(request)
+    if response.status_code == httpx.codes.NOT_MODIFIED and cached_body is None:
+        # Nothing to replay the 304 with; ask again for the full response
+        request.headers.pop("If-None-Match", None)
+        response = GITHUB_HTTP.send(request)
+    return _use_cached_body(response, cached_body)
+
+
+async def github_get_async(url: str, params: Any = None) -> httpx.Response:
+    """GET a GitHub API URL asynchronously, revalidating any cached copy with its ETag.
+
+    Args:
+        url (str): The GitHub API URL.
+        params (Any): Optional query parameters.
+
+    Returns:
+        httpx.Response: The response.
+    """
+    request, cached_body = _build_conditional_request(GITHUB_HTTP_ASYNC, url, params)
+    response = await GITHUB_HTTP_ASYNC.send(request)
+    if response.status_code == httpx.codes.NOT_MODIFIED and cached_body is None:
+        # Nothing to replay the 304 with; ask again for the full response
+        request.headers.pop("If-None-Match", None)
+        response = await GITHUB_HTTP_ASYNC.send(request)
+    return _use_cached_body(response, cached_body)
+
+
+async def github_graphql_async(query: str, variables: dict[str, Any]) -> dict[str, Any] | None:
+    """Run a GitHub GraphQL query.
+
+    The GraphQL API requires authentication, so no request is made unless
+    GITHUB_TOKEN is set.
+
+    Args:
+        query (str): The GraphQL query.
+        variables (dict[str, Any]): The query variables.
+
+    Returns:
+        dict[str, Any] | None: The query data, or None if unauthenticated or the request or query failed.
+    """
+    if not _GITHUB_TOKEN:
+        return None
+
+    try:
+        res = await GITHUB_HTTP_ASYNC.post(
+            GITHUB_GRAPHQL_URL,
+            content=orjson.dumps({"query": query, "variables": variables}),
+            headers={"Content-Type": "application/json"},
+        )
+    except httpx.HTTPError as e:
+        print("[github_graphql_async] Request failed:", e)
+        return None
+    if not res.is_success:
+        return None
+
+    payload = orjson.loads(res.content)
+    if payload.get("errors"):
+        print("[github_graphql_async] Query errors:", payload["errors"])
+        return None
+    return payload.get("data")
+
+
+# Successful /user lookups as (username, expires_at) on the monotonic clock
+_username_cache: dict[str, tuple[str, float]] = {}
 
 
 def get_authenticated_username() -> str | None:
     """Get the username of the authenticated user, if any.
 
+    Successful lookups are reused for USERNAME_TTL seconds; failures are not cached.
+
     Returns:
         str | None: The username of the authenticated user, or None if not authenticated.
     """
     user_url = "https://api.github.com/user"
-    user_res = httpx.get(user_url, headers=get_headers())
+    now = time.monotonic()
+    cached = _username_cache.get(user_url)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    user_res = github_get(user_url)
 
     if not user_res.is_success:
         return None
 
-    return str(user_res.json().get("login"))
+    username = str(orjson.loads(user_res.content).get("login"))
+    _username_cache[user_url] = (username, now + USERNAME_TTL)
+    return username
 
 
 def create_issue(repo: str, title: str, body: str) -> bool:  # noqa: ARG001
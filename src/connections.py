@@ -1,46 +1,84 @@
 """Connections to OpenAI and Azure OpenAI clients."""
 
 import os
-from typing import Any
+from functools import lru_cache
 
+import aiohttp
+from azure.ai.inference.aio import ChatCompletionsClient as AsyncChatCompletionsClient
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AioHttpTransport
+from openai import AsyncOpenAI
 
-def get_azure_openai_client() -> Any:
-    """Get Azure OpenAI client.
+AZURE_ENDPOINT = "https://models.github.ai/inference"
+MAX_CONNECTIONS = 1000  # Max pooled connections for the async inference client
+MAX_CONNECTIONS_PER_HOST = 100  # Max connections to the inference endpoint
+
+
+def get_azure_token() -> str:
+    """Get the GitHub Models token for the Azure inference endpoint.
 
     Raises:
-        ValueError: If AZURE_TOKEN environment variable is not set.
+        ValueError: If GITHUB_OPENAI_API_KEY environment variable is not set.
 
     Returns:
-        ChatCompletionsClient: Azure OpenAI client.
+        str: The API token.
     """
-    from azure.ai.inference import ChatCompletionsClient
-    from azure.core.credentials import AzureKeyCredential
-
-    azure_endpoint = "https://models.github.ai/inference"
     azure_token = os.getenv("GITHUB_OPENAI_API_KEY")
-
     if not azure_token:
-        err_msg = "AZURE_TOKEN environment variable not set."
+        err_msg = "GITHUB_OPENAI_API_KEY environment variable not set."
         raise ValueError(err_msg)
-    return ChatCompletionsClient(
-        endpoint=azure_endpoint,
-        credential=AzureKeyCredential(azure_token),
-    )
+    return azure_token
 
 
-def get_openai_client() -> Any:
-    """Get OpenAI client.
+def get_openai_token() -> str:
+    """Get the OpenAI API key.
 
     Raises:
         ValueError: If OPENAI_API_KEY environment variable is not set.
 
     Returns:
-        OpenAI: OpenAI client.
+        str: The API key.
     """
-    from openai import OpenAI
-
     openai_token = os.getenv("OPENAI_API_KEY")
     if not openai_token:
         err_msg = "OPENAI_API_KEY environment variable not set."
         raise ValueError(err_msg)
-    return OpenAI(api_key=openai_token)
+    return openai_token
+
+
+@lru_cache(maxsize=1)
+def get_azure_chat_client_async() -> AsyncChatCompletionsClient:
+    """Get the shared asynchronous Azure OpenAI client.
+
+    The client's aiohttp session binds to the running event loop, so this must
+    be called from a coroutine.
+
+    Returns:
+        AsyncChatCompletionsClient: Azure OpenAI client.
+    """
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+    return AsyncChatCompletionsClient(
+        endpoint=AZURE_ENDPOINT,
+        credential=AzureKeyCredential(get_azure_token()),
+        transport=AioHttpTransport(session=aiohttp.ClientSession(connector=connector)),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_openai_client_async() -> AsyncOpenAI:
+    """Get the shared asynchronous OpenAI client.
+
+    Returns:
+        AsyncOpenAI: OpenAI client.
+    """
+    return AsyncOpenAI(api_key=get_openai_token())
+
+
+async def close_async_clients() -> None:
+    """Close the shared async inference clients opened by this process."""
+    if get_azure_chat_client_async.cache_info().currsize:
+        await get_azure_chat_client_async().close()
+        get_azure_chat_client_async.cache_clear()
+    if get_openai_client_async.cache_info().currsize:
+        await get_openai_client_async().close()
+        get_openai_client_async.cache_clear()
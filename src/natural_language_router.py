@@ -1,49 +1,22 @@
 """Natural language command router for GitHub-related tasks."""
 
-import json
-import os
+import asyncio
 from typing import Any, Literal
 
-import httpx
-from azure.ai.inference import ChatCompletionsClient
+import orjson
 from azure.ai.inference.models import SystemMessage, UserMessage
-from azure.core.credentials import AzureKeyCredential
 from dotenv import load_dotenv
 
-from commands import create_issue, create_repo
+from commands import create_issue, create_repo, github_get_async
+from connections import get_azure_chat_client_async
 from summarizers import summarize_any_repo, summarize_latest_issue
 
 load_dotenv()
 
-
-def get_azure_openai_client() -> ChatCompletionsClient:
-    """Initialize and return an Azure OpenAI ChatCompletionsClient.
-
-    Raises:
-        ValueError: If the GITHUB_OPENAI_API_KEY environment variable is not set.
-
-    Returns:
-        ChatCompletionsClient: The initialized client.
-    """
-    endpoint = "https://models.github.ai/inference"
-    # model_name = "openai/gpt-4o"
-    token = os.getenv("GITHUB_OPENAI_API_KEY")
-
-    if not token:
-        err_msg = "GITHUB_OPENAI_API_KEY environment variable not set."
-        raise ValueError(err_msg)
-
-    return ChatCompletionsClient(
-        endpoint=endpoint,
-        credential=AzureKeyCredential(token),
-    )
-
-
-client = get_azure_openai_client()
 # model_name = "openai/gpt-4o"
 
 
-def github_search_repo(query: str) -> str | None:
+async def github_search_repo(query: str) -> str | None:
     """Search GitHub for a repository matching the query.
 
     Args:
@@ -53,28 +26,34 @@ def github_search_repo(query: str) -> str | None:
         str | None: The full name of the best matching
         repository, or None if no match found.
     """
-    headers = {"Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}", "Accept": "application/vnd.github+json"}
-
-    terms = "+".join(query.strip().split())
-    url = f"https://api.github.com/search/repositories?q={terms}+in:name,description&sort=stars&order=desc&per_page=10"
+    url = "https://api.github.com/search/repositories"
+    params = {
+        "q": f"{' '.join(query.split())} in:name,description",
+        "sort": "stars",
+        "order": "desc",
+        "per_page": 10,
+    }
 
     try:
-        res = httpx.get(url, headers=headers)
+        res = await github_get_async(url, params=params)
         if res.is_success:
-            items = res.json().get("items", [])
+            items = orjson.loads(res.content).get("items", [])
             query_lower = query.lower()
+            soft_match = None
 
-            # Prefer exact or substring match in full_name
             for item in items:
+                # Prefer exact name or substring match in full_name
                 if item["name"].lower() == query_lower or query_lower in item["full_name"].lower():
                     print("[github_search_repo] Strong match:", item["full_name"])
                     return item["full_name"]
 
-            # Fallback: check description/name contains query
-            for item in items:
-                if query_lower in (item.get("description") or "").lower() or query_lower in item["name"].lower():
-                    print("[github_search_repo] Soft match:", item["full_name"])
-                    return item["full_name"]
+                # Fallback: remember the first description match
+                if soft_match is None and query_lower in (item.get("description") or "").lower():
+                    soft_match = item["full_name"]
+
+            if soft_match:
+                print("[github_search_repo] Soft match:", soft_match)
+                return soft_match
 
             if items:
                 print("[github_search_repo] Weak fallback match:", items[0]["full_name"])
@@ -85,9 +64,12 @@ def github_search_repo(query: str) -> str | None:
     return None
 
 
-def parse_command_naturally(user_input: str, model_name: str) -> dict[str, str | None] | Any:
+async def parse_command_naturally(user_input: str, model_name: str) -> dict[str, str | None] | Any:
     """Parse a natural language command into structured intent.
 
+    A GitHub repo search runs alongside the model call and is only used if the
+    model does not name a repo.
+
     Args:
         user_input (str): The natural language command input.
         model_name (str): The model name to use for parsing.
@@ -116,8 +98,11 @@ Input: "I want to file a bug in next.js"
 Now extract the intent from: "{user_input}"
 """.strip()
 
+    # Start the fallback search now so it overlaps the (much slower) LLM round trip
+    search_task = asyncio.create_task(github_search_repo(user_input))
+
     try:
-        response = client.complete(  # type: ignore[unresolved-attribute]
+        response = await get_azure_chat_client_async().complete(
             model=model_name,
             temperature=0.2,
             max_tokens=300,
@@ -134,7 +119,7 @@ Now extract the intent from: "{user_input}"
             if raw.startswith("json"):
                 raw = raw[len("json") :].strip()
 
-        parsed = json.loads(raw)
+        parsed = orjson.loads(raw)
 
         # Guess repo if needed
         if parsed.get("action") in {
@@ -142,7 +127,7 @@ Now extract the intent from: "{user_input}"
             "summarize_latest_issue",
             "create_issue",
         } and not parsed.get("repo"):
-            guess = github_search_repo(user_input)
+            guess = await search_task
             if guess:
                 parsed["repo"] = guess
                 print("[parse_command_naturally] Guessed repo:", guess)
@@ -157,9 +142,12 @@ Now extract the intent from: "{user_input}"
             "body": None,
             "issue_number": None,
         }
+    finally:
+        # Discard the speculative search if the model already named a repo
+        search_task.cancel()
 
 
-def route_natural_command(
+async def route_natural_command(
     user_text: str,
     model_name: str,
 ) -> (
@@ -180,15 +168,15 @@ def route_natural_command(
     Returns:
         str | None: The result of the executed action, or None if no action taken.
     """
-    intent = parse_command_naturally(user_text, model_name)
+    intent = await parse_command_naturally(user_text, model_name)
     print("[route_natural_command] Parsed intent:", intent)
     action = intent.get("action")
     repo = intent.get("repo")
 
     if action == "summarize_repo" and repo:
-        return summarize_any_repo(repo)
+        return await summarize_any_repo(repo)
     if action == "summarize_latest_issue" and repo:
-        return summarize_latest_issue(repo)
+        return await summarize_latest_issue(repo)
     if action == "create_repo" and intent.get("repo_name"):
         return "Created repo." if create_repo(intent["repo_name"]) else "Failed to create repo."
     if action == "create_issue" and repo:
@@ -1,17 +1,23 @@
 """Summarization utilities using OpenAI or Azure OpenAI."""
 
+import asyncio
 import base64
+import hashlib
 import logging
+import math
 import os
-from typing import Literal
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Literal
 
 import httpx
+import orjson
 import tiktoken
+from azure.ai.inference.models import SystemMessage, UserMessage
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, SystemMessage
 
-from commands import get_headers
-from connections import get_azure_openai_client, get_openai_client
+from commands import github_get_async, github_graphql_async
+from connections import get_azure_chat_client_async, get_openai_client_async
 
 load_dotenv()
 
@@ -23,22 +29,43 @@ USE_AZURE = bool(os.getenv("GITHUB_OPENAI_API_KEY"))
 MAX_TOKENS = 16000
 SLICE_LIMIT = 4000  # Max README slice size
 ASK_OPENAI_MAX_LENGTH = 1000  # Max response length
+STREAM_OVERRUN = 50  # Extra characters read past the max length before closing the stream
 AZ_OPENAI_MODEL_NAME = "openai/gpt-4o"
 MODEL_NAME = "gpt-4o"
-
-client = get_azure_openai_client() if USE_AZURE else get_openai_client()
-
-
-def get_encoder(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
-    """Get the appropriate tokenizer/encoder based on the model being used.
-
-    Args:
-        encoding_name (str): The name of the encoding to use.
-
-    Returns:
-        tiktoken.Encoding: The tokenizer/encoder.
-    """
-    return tiktoken.get_encoding(encoding_name)
+SUMMARY_CACHE_SIZE = 1024  # Max cached summaries
+
+# Repo metadata and README in one round trip; the aliases cover the common README file names
+REPO_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    owner { login }
+    description
+    stargazerCount
+    forkCount
+    primaryLanguage { name }
+    readmeMd: object(expression: "HEAD:README.md") { ... on Blob { text } }
+    readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+    readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { text } }
+  }
+}
+"""
+
+# README noise that costs tokens without informing a summary
+IMG_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+HTML_RE = re.compile(r"</?[A-Za-z][^<>\n]*>")
+URL_RE = re.compile(r"https?://\S+")
+WS_RE = re.compile(r"[ \t]+")
+NEWLINE_RE = re.compile(r"\r\n?")
+BLANK_LINES_RE = re.compile(r"[ \t]*\n[ \t]*\n(?:[ \t]*\n)*[ \t]*")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Tokenizer for gpt-4o prompts, loaded once per process
+_ENCODER = tiktoken.get_encoding("cl100k_base")
+
+# Exact-match LRU cache of model summaries, keyed on a digest of the prompt
+_summary_cache: OrderedDict[str, str] = OrderedDict()
 
 
 def num_tokens(text: str, encoder: tiktoken.Encoding) -> int:
@@ -52,7 +79,7 @@ def num_tokens(text: str, encoder: tiktoken.Encoding) -> int:
         int: The number of tokens.
     """
 
-    return len(encoder.encode(text))
+    return len(encoder.encode(text, disallowed_special=()))
 
 
 def truncate_text(text: str, token_limit: int, encoder: tiktoken.Encoding) -> str:
@@ -66,47 +93,272 @@ def truncate_text(text: str, token_limit: int, encoder: tiktoken.Encoding) -> st
     Returns:
         str: The truncated text.
     """
-    tokens = encoder.encode(text)
+    tokens = encoder.encode(text, disallowed_special=())
     return encoder.decode(tokens[:token_limit])
 
 
-def ask_openai(prompt: str) -> None:
-    """Ask OpenAI or Azure OpenAI to summarize the given prompt.
+def select_paragraphs(
+    paragraphs: list[str],
+    paragraph_tokens: list[list[int]],
+    query: str,
+    token_limit: int,
+    encoder: tiktoken.Encoding,
+) -> str:
+    """Keep the README paragraphs most relevant to the query that fit the token limit.
+
+    Paragraphs are ranked by TF-IDF weight of the query terms, after the opening
+    paragraph. The opening paragraph is only kept if it fits the limit on its
+    own; otherwise it is dropped. The selection keeps the original order.
+
+    Args:
+        paragraphs (list[str]): The README paragraphs.
+        paragraph_tokens (list[list[int]]): The tokens of each paragraph, as already encoded by the caller.
+        query (str): Text describing the repo (name and description).
+        token_limit (int): The maximum number of tokens allowed.
+        encoder (tiktoken.Encoding): The tokenizer/encoder to use.
+
+    Returns:
+        str: The selected paragraphs, or the opening paragraph truncated to the limit if none fit.
+    """
+    counts = [Counter(WORD_RE.findall(paragraph.lower())) for paragraph in paragraphs]
+    doc_freq = Counter(term for count in counts for term in count)
+    idf = {term: math.log((1 + len(paragraphs)) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    query_terms = set(WORD_RE.findall(query.lower())) & idf.keys()
+
+    def score(index: int) -> float:
+        total = sum(counts[index].values()) or 1
+        return sum(counts[index][term] / total * idf[term] for term in query_terms)
+
+    ranked = [0, *sorted(range(1, len(paragraphs)), key=lambda i: (-score(i), i))]
+
+    selected = []
+    remaining = token_limit
+    for index in ranked:
+        cost = len(paragraph_tokens[index]) + 1  # +1 for the paragraph break
+        if cost <= remaining:
+            selected.append(index)
+            remaining -= cost
+
+    if not selected:
+        # Every paragraph is over the limit, so the text's first tokens all come from the opening one
+        return encoder.decode(paragraph_tokens[0][:token_limit])
+    return "\n\n".join(paragraphs[index] for index in sorted(selected))
+
+
+def clean_readme(text: str) -> str:
+    """Strip images, link targets, HTML, bare URLs and extra whitespace from README text.
+
+    Paragraph breaks are kept so the README structure survives.
+
+    Args:
+        text (str): The decoded README text.
+
+    Returns:
+        str: The cleaned README text.
+    """
+    text = NEWLINE_RE.sub("\n", text)
+    text = IMG_RE.sub("", text)
+    text = LINK_RE.sub(r"\1", text)
+    text = HTML_RE.sub("", text)
+    text = URL_RE.sub("", text)
+    text = WS_RE.sub(" ", text)
+    return BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def decode_readme(readme_res: httpx.Response) -> str:
+    """Decode the README from a REST `/readme` response.
+
+    Args:
+        readme_res (httpx.Response): The response from the README endpoint.
+
+    Returns:
+        str: The README text, or an empty string if there is none.
+    """
+    if not readme_res.is_success:
+        return ""
+    content = orjson.loads(readme_res.content).get("content", "")
+    return base64.b64decode(content).decode("utf-8", errors="ignore")
+
+
+async def fetch_repo_graphql(repo_full_name: str) -> tuple[dict[str, Any], str] | None:
+    """Fetch repo metadata and README with a single GraphQL query.
+
+    Args:
+        repo_full_name (str): The full name of the repository (e.g., "owner/repo").
+
+    Returns:
+        tuple[dict[str, Any], str] | None: REST-shaped repo metadata and the README text,
+        or None if GraphQL is unavailable or the repo was not found.
+    """
+    owner, _, name = repo_full_name.partition("/")
+    data = await github_graphql_async(REPO_QUERY, {"owner": owner, "name": name})
+    repo = data.get("repository") if data else None
+    if not repo:
+        return None
+
+    readme_blobs = (repo["readmeMd"], repo["readmeLower"], repo["readmeRst"])
+    readme_text = next((blob["text"] for blob in readme_blobs if blob and blob.get("text")), None)
+    if readme_text is None:
+        # Less common README name; let the REST endpoint find it
+        readme_text = decode_readme(await github_get_async(f"https://api.github.com/repos/{repo_full_name}/readme"))
+
+    metadata = {
+        "name": repo["name"],
+        "owner": repo["owner"],
+        "description": repo["description"],
+        "stargazers_count": repo["stargazerCount"],
+        "forks_count": repo["forkCount"],
+        "language": (repo["primaryLanguage"] or {}).get("name"),
+    }
+    return metadata, readme_text
+
+
+async def fetch_repo_rest(repo_full_name: str) -> tuple[dict[str, Any], str] | None:
+    """Fetch repo metadata and README with two concurrent REST requests.
+
+    Args:
+        repo_full_name (str): The full name of the repository (e.g., "owner/repo").
+
+    Returns:
+        tuple[dict[str, Any], str] | None: The repo metadata and the README text, or None if the repo was not found.
+    """
+    repo_url = f"https://api.github.com/repos/{repo_full_name}"
+    repo_res, readme_res = await asyncio.gather(
+        github_get_async(repo_url),
+        github_get_async(f"{repo_url}/readme"),
+    )
+    if not repo_res.is_success:
+        return None
+    return orjson.loads(repo_res.content), decode_readme(readme_res)
+
+
+def prompt_cache_key(prompt: str) -> str:
+    """Build the summary cache key for a prompt.
+
+    Args:
+        prompt (str): The prompt sent to the model.
+
+    Returns:
+        str: A short digest of the prompt.
+    """
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+async def open_summary_stream(prompt: str) -> Any:
+    """Start a streamed summary from Azure OpenAI or OpenAI.
 
     Args:
         prompt (str): The prompt to summarize.
 
     Returns:
-        str | None: The summary returned by the model, or None on failure.
+        Any: The async completion stream of the configured provider.
     """
-    try:
-        if USE_AZURE:
-            response = client.complete(  # type: ignore[unresolved-attribute]
-                model=AZ_OPENAI_MODEL_NAME,
-                temperature=0.2,
-                max_tokens=700,
-                messages=[
-                    SystemMessage(content="Summarize GitHub repo content in under 1000 characters."),
-                    HumanMessage(content=prompt),
-                ],
-            )
-            return response.choices[0].message.content.strip()
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
+    if USE_AZURE:
+        return await get_azure_chat_client_async().complete(
+            model=AZ_OPENAI_MODEL_NAME,
             temperature=0.2,
             max_tokens=700,
             messages=[
-                {"role": "system", "content": "Summarize GitHub repo content in under 1000 characters."},
-                {"role": "user", "content": prompt},
+                SystemMessage("Summarize GitHub repo content in under 1000 characters."),
+                UserMessage(prompt),
             ],
+            stream=True,
         )
-        return response.choices[0].message.content.strip()
+    return await get_openai_client_async().chat.completions.create(
+        model=MODEL_NAME,
+        temperature=0.2,
+        max_tokens=700,
+        messages=[
+            {"role": "system", "content": "Summarize GitHub repo content in under 1000 characters."},
+            {"role": "user", "content": prompt},
+        ],
+        stream=True,
+    )
+
+
+async def read_summary_stream(stream: Any) -> str:
+    """Collect a streamed summary, closing the stream once it overruns the length budget.
+
+    Args:
+        stream (Any): An async completion stream from open_summary_stream.
+
+    Returns:
+        str: The streamed text, stripped.
+    """
+    chunks: list[str] = []
+    length = 0
+    async with stream:
+        async for update in stream:
+            if not update.choices or not update.choices[0].delta.content:
+                continue
+            chunks.append(update.choices[0].delta.content)
+            length += len(chunks[-1])
+            if length > ASK_OPENAI_MAX_LENGTH + STREAM_OVERRUN:
+                log.info("[read_summary_stream] Length budget reached, closing stream.")
+                break
+    return "".join(chunks).strip()
+
+
+def trim_summary(summary: str, max_length: int) -> str:
+    """Trim a summary to the length limit at the last full sentence.
+
+    Without a sentence break, the summary is cut at the last whitespace instead.
+
+    Args:
+        summary (str): The summary text.
+        max_length (int): The maximum number of characters allowed.
+
+    Returns:
+        str: The summary, no longer than max_length.
+    """
+    if len(summary) <= max_length:
+        return summary
+    head, sep, _ = summary[:max_length].rpartition(".")
+    if sep:
+        return head + sep
+    return summary[: max_length - 1].rsplit(None, 1)[0]
+
+
+async def ask_openai(prompt: str) -> str | None:
+    """Ask OpenAI or Azure OpenAI to summarize the given prompt.
+
+    The response is streamed and cut off once it overruns the SMS length
+    budget, then trimmed back to the last full sentence. Summaries are cached
+    by prompt, so repeated requests for unchanged content are answered without
+    calling the model again. Failures are not cached.
+
+    Args:
+        prompt (str): The prompt to summarize.
+
+    Returns:
+        str | None: The summary returned by the model, or None on failure.
+    """
+    key = prompt_cache_key(prompt)
+    cached = _summary_cache.get(key)
+    if cached is not None:
+        _summary_cache.move_to_end(key)
+        log.info("[ask_openai] Cache hit: %s", key)
+        return cached
+
+    try:
+        stream = await open_summary_stream(prompt)
+        summary = await read_summary_stream(stream)
     except Exception as e:
         log.error("[ask_openai] Error: %s", e)
         return None
 
+    if not summary:
+        log.error("[ask_openai] No content returned.")
+        return None
+    summary = trim_summary(summary, ASK_OPENAI_MAX_LENGTH)
+
+    _summary_cache[key] = summary
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return summary
+
 
-def summarize_any_repo(repo_full_name: str) -> str:
+async def summarize_any_repo(repo_full_name: str) -> str:
     """Summarize any GitHub repository using its full name.
 
     Args:
@@ -116,28 +368,18 @@ def summarize_any_repo(repo_full_name: str) -> str:
         str: The summary of the repository.
 
     """
-    encoder = get_encoder()
     print(f"[summarize_any_repo] Summarizing {repo_full_name}")
-    headers = {"Accept": "application/vnd.github+json", "Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}"}
-
-    repo_url = f"https://api.github.com/repos/{repo_full_name}"
-    readme_url = f"{repo_url}/readme"
 
     try:
-        repo_res = httpx.get(repo_url, headers=headers)
-        readme_res = httpx.get(readme_url, headers=headers)
-
-        if not repo_res.is_success:
+        # GraphQL needs a token; without one (or if the query fails) use the REST endpoints
+        fetched = await fetch_repo_graphql(repo_full_name) or await fetch_repo_rest(repo_full_name)
+        if fetched is None:
             return "Could not find repo."
 
-        repo = repo_res.json()
-        readme = readme_res.json().get("content", "") if readme_res.is_success else ""
+        repo, readme_text = fetched
+        readme_text = clean_readme(readme_text)
 
-        readme = readme.encode("utf-8")
-
-        readme_text = base64.b64decode(readme).decode("utf-8", errors="ignore")
-
-        prompt = f"""
+        prompt_header = f"""
 Summarize this GitHub repo:
 
 Repo Name: {repo.get("name")}
@@ -148,29 +390,22 @@ Forks: {repo.get("forks_count")}
 Primary Language: {repo.get("language")}
 
 README:
-{readme_text}
-        """.strip()
-
-        total_tokens = num_tokens(prompt, encoder)
-        if total_tokens > MAX_TOKENS:
+""".lstrip()
+
+        # Tokenize the README once, by paragraph; if over budget, keep the most relevant paragraphs.
+        # Special-token text in a README is plain text here, so skip that scan.
+        allowable_tokens = MAX_TOKENS - num_tokens(prompt_header, _ENCODER)
+        paragraphs = readme_text.split("\n\n")
+        paragraph_tokens = [_ENCODER.encode(paragraph, disallowed_special=()) for paragraph in paragraphs]
+        readme_token_count = sum(map(len, paragraph_tokens)) + len(paragraphs) - 1  # +1 per paragraph break
+        if readme_token_count > allowable_tokens:
             print(f"[summarize_any_repo] Trimming README to fit {MAX_TOKENS} token budget.")
-            allowable_tokens = MAX_TOKENS - num_tokens(prompt, encoder) + num_tokens(readme_text, encoder)
-            readme_text = truncate_text(readme_text, allowable_tokens)
-            prompt = f"""
-Summarize this GitHub repo:
-
-Repo Name: {repo.get("name")}
-Owner: {repo.get("owner", {}).get("login")}
-Description: {repo.get("description")}
-Stars: {repo.get("stargazers_count")}
-Forks: {repo.get("forks_count")}
-Primary Language: {repo.get("language")}
+            query = f"{repo.get('name')} {repo.get('description') or ''}"
+            readme_text = select_paragraphs(paragraphs, paragraph_tokens, query, allowable_tokens, _ENCODER)
 
-README:
-{readme_text}
-            """.strip()
+        prompt = f"{prompt_header}{readme_text}".strip()
 
-        summary = ask_openai(prompt)
+        summary = await ask_openai(prompt)
         return summary or "AI summarization failed."
 
     except Exception as e:
@@ -178,7 +413,7 @@ README:
         return "Something went wrong."
 
 
-def summarize_latest_issue(
+async def summarize_latest_issue(
     repo_full_name: str,
 ) -> Literal["AI summarization failed.", "Failed to summarize issue.", "No issues found."]:
     """Summarize the latest issue in a GitHub repository.
@@ -191,14 +426,14 @@ def summarize_latest_issue(
         str: The summary of the latest issue.
     """
     print(f"[summarize_latest_issue] Summarizing latest issue in {repo_full_name}")
-    headers = {"Accept": "application/vnd.github+json", "Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}"}
 
     issues_url = f"https://api.github.com/repos/{repo_full_name}/issues"
     try:
-        res = httpx.get(issues_url, headers=headers, params={"state": "open", "per_page": 1})
-        if not res.is_success or not res.json():
+        res = await github_get_async(issues_url, params={"state": "open", "per_page": 1})
+        issues = orjson.loads(res.content) if res.is_success else None
+        if not issues:
             return "No issues found."
-        issue = res.json()[0]
+        issue = issues[0]
 
         issue_text = f"Issue #{issue['number']}: {issue['title']}\n{issue.get('body', '')}"
         prompt = f"""
@@ -207,7 +442,7 @@ def summarize_latest_issue(
             Return plain text only. No formatting.
         """.strip()
 
-        summary = ask_openai(prompt)
+        summary = await ask_openai(prompt)
         return summary or "AI summarization failed."
     except Exception as e:
         log.error("[summarize_latest_issue] Error: %s", e)
@@ -290,7 +525,7 @@ def summarize_latest_issue(
 #     return summarize_issue_thread(owner, repo, issue["number"])
 
 
-def summarize_specific_issue(owner_repo: str, issue_number: int) -> str | None:
+async def summarize_specific_issue(owner_repo: str, issue_number: int) -> str | None:
     """
     Summarize a specific issue in the given GitHub repository.
 
@@ -306,10 +541,10 @@ def summarize_specific_issue(owner_repo: str, issue_number: int) -> str | None:
     except ValueError:
         return "Invalid format. Use <owner>/<repo>"
 
-    return summarize_issue_thread(owner, repo, issue_number)
+    return await summarize_issue_thread(owner, repo, issue_number)
 
 
-def summarize_issue_thread(owner: str, repo: str, issue_number: int) -> str | None:
+async def summarize_issue_thread(owner: str, repo: str, issue_number: int) -> str | None:
     """
     Summarize the thread of a specific issue in a GitHub repository.
 
@@ -323,17 +558,19 @@ def summarize_issue_thread(owner: str, repo: str, issue_number: int) -> str | No
     """
     issue_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}"
     comments_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/comments"
-    issue_res = httpx.get(issue_url, headers=get_headers())
-    comments_res = httpx.get(comments_url, headers=get_headers())
+    issue_res, comments_res = await asyncio.gather(
+        github_get_async(issue_url),
+        github_get_async(comments_url),
+    )
 
     if not issue_res.is_success or not comments_res.is_success:
         print("[summarize_issue_thread] Failed to fetch issue or comments.")
         return None
 
-    issue = issue_res.json()
+    issue = orjson.loads(issue_res.content)
     thread = f"Issue #{issue_number}: {issue.get('title')}\n{issue.get('body', '')}"
-    for comment in comments_res.json():
+    for comment in orjson.loads(comments_res.content):
         thread += "\n" + comment.get("body", "")
 
     prompt = f"Summarize this GitHub issue thread:\n{thread}"
-    return ask_openai(prompt)
+    return await ask_openai(prompt)
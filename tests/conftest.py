@@ -0,0 +1,69 @@
+"""Shared test fixtures."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+import commands
+
+
+def empty_github_caches(mocker) -> None:
+    """Swap in empty GitHub response and username caches for one test."""
+    mocker.patch.object(commands, "_etag_cache", {})
+    mocker.patch.object(commands, "_username_cache", {})
+
+
+@pytest.fixture
+def github_caches(mocker) -> None:
+    """Start with empty GitHub response and username caches."""
+    empty_github_caches(mocker)
+
+
+@pytest.fixture
+def summarizers(mocker) -> ModuleType:
+    """Import summarizers without loading the tokenizer, with empty caches.
+
+    Returns:
+        ModuleType: The summarizers module.
+    """
+    empty_github_caches(mocker)
+    mocker.patch("tiktoken.get_encoding")
+    import summarizers
+
+    mocker.patch.object(summarizers, "_summary_cache", OrderedDict())
+    return summarizers
+
+
+@pytest.fixture
+def openai_client(mocker, summarizers):
+    """Send summaries to a mocked OpenAI client with an async `create`.
+
+    Returns:
+        MagicMock: The mocked AsyncOpenAI client.
+    """
+    client = mocker.patch.object(summarizers, "get_openai_client_async").return_value
+    client.chat.completions.create = mocker.AsyncMock()
+    mocker.patch.object(summarizers, "USE_AZURE", new=False)
+    return client
+
+
+@pytest.fixture
+def openai_stream(mocker, openai_client) -> Callable[..., Iterator[SimpleNamespace]]:
+    """Make the mocked OpenAI client stream back the given content pieces.
+
+    Returns:
+        Callable[..., Iterator[SimpleNamespace]]: Sets the streamed reply and returns
+        the iterator of updates, so tests can see how much was left unread.
+    """
+
+    def reply(*pieces: str) -> Iterator[SimpleNamespace]:
+        updates = iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p))]) for p in pieces])
+        stream = mocker.MagicMock()
+        stream.__aenter__.return_value = stream
+        stream.__aiter__.return_value = updates
+        openai_client.chat.completions.create.return_value = stream
+        return updates
+
+    return reply
@@ -1,6 +1,14 @@
 """Test commands."""
 
-from commands import get_authenticated_username
+import asyncio
+
+import httpx
+import pytest
+
+import commands
+from commands import get_authenticated_username, github_get, github_get_async
+
+pytestmark = pytest.mark.usefixtures("github_caches")
 
 
 def test_get_authenticated_username(mocker) -> None:
@@ -9,9 +17,71 @@ def test_get_authenticated_username(mocker) -> None:
 
     Asserts:
         - The username returned is as expected.
+        - A second call within the TTL is served from the cache.
     """
-    mocker.patch("commands.httpx.get", return_value=mocker.Mock(is_success=True, json=lambda: {"login": "testuser"}))
+    send = mocker.patch.object(
+        commands.GITHUB_HTTP,
+        "send",
+        side_effect=lambda request: httpx.Response(200, json={"login": "testuser"}, request=request),
+    )
 
     username = get_authenticated_username()
 
     assert username == "testuser"
+    assert get_authenticated_username() == "testuser"
+    assert send.call_count == 1
+
+
+def test_github_get_revalidates_with_etag(mocker) -> None:
+    """
+    Test conditional GitHub requests.
+
+    Asserts:
+        - The second request sends the ETag from the first response.
+        - A 304 response is answered with the cached body.
+    """
+    url = "https://api.github.com/repos/octocat/Hello-World"
+
+    def send_conditional(request: httpx.Request) -> httpx.Response:
+        if "If-None-Match" in request.headers:
+            return httpx.Response(304, request=request)
+        return httpx.Response(200, json={"name": "Hello-World"}, headers={"ETag": '"abc"'}, request=request)
+
+    send = mocker.patch.object(commands.GITHUB_HTTP, "send", side_effect=send_conditional)
+
+    first = github_get(url)
+    second = github_get(url)
+
+    assert send.call_args.args[0].headers["If-None-Match"] == '"abc"'
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"name": "Hello-World"}
+
+
+def test_github_get_async_survives_eviction_in_flight(mocker) -> None:
+    """
+    Test a 304 for an ETag that a concurrent request evicted while it was in flight.
+
+    Asserts:
+        - The body captured when the request was built is replayed.
+    """
+    issues_url = "https://api.github.com/repos/octocat/Hello-World/issues"
+    pulls_url = "https://api.github.com/repos/octocat/Hello-World/pulls"
+
+    async def send_slow_304(request: httpx.Request) -> httpx.Response:
+        if "If-None-Match" in request.headers:
+            await asyncio.sleep(0.01)
+            return httpx.Response(304, request=request)
+        return httpx.Response(200, json=[{"number": 1}], headers={"ETag": '"abc"'}, request=request)
+
+    mocker.patch.object(commands, "ETAG_CACHE_SIZE", 1)
+    mocker.patch.object(commands.GITHUB_HTTP_ASYNC, "send", side_effect=send_slow_304)
+
+    async def revalidate_while_evicting() -> httpx.Response:
+        await github_get_async(issues_url)
+        revalidated, _ = await asyncio.gather(github_get_async(issues_url), github_get_async(pulls_url))
+        return revalidated
+
+    response = asyncio.run(revalidate_while_evicting())
+
+    assert response.status_code == 200
+    assert response.json() == [{"number": 1}]
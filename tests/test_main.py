@@ -0,0 +1,91 @@
+"""Test the SMS webhook."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.usefixtures("summarizers")
+def test_webhook_help() -> None:
+    """
+    Test the help command through the webhook.
+
+    Asserts:
+        - The app is importable without running it as a script.
+        - The reply is TwiML listing the available commands.
+    """
+    from main import app
+
+    response = TestClient(app).post("/webhook", data={"From": "+15555550100", "Body": "help"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/xml")
+    assert b"<Message>Available commands:" in response.content
+
+
+@pytest.mark.usefixtures("summarizers")
+@pytest.mark.parametrize(
+    ("text", "groups"),
+    [
+        ("help", {"help": "help"}),
+        ("HELP", {"help": "HELP"}),
+        ("create repo demo", {"repo_name": "demo"}),
+        ("create repository demo", None),
+        (
+            "create issue octocat/Hello-World Broken link -- The docs link 404s",
+            {"ci_repo": "octocat/Hello-World", "ci_title": "Broken link", "ci_body": "The docs link 404s"},
+        ),
+        (
+            "create issue octocat/Hello-World Crash -- Steps:\nrun it",
+            {"ci_repo": "octocat/Hello-World", "ci_title": "Crash", "ci_body": "Steps:\nrun it"},
+        ),
+        ("create issue octocat/Hello-World -- No title", {"ci_repo": "octocat/Hello-World", "ci_body": "No title"}),
+        ("create issue octocat/Hello-World", {"ci_usage": "create issue octocat/Hello-World"}),
+        ("summarize octocat/Hello-World", {"sum_repo": "octocat/Hello-World"}),
+        ("summarize octocat/Hello-World issue", {"sum_repo": "octocat/Hello-World", "issue": "issue"}),
+        (
+            "summarize octocat/Hello-World issue 5",
+            {"sum_repo": "octocat/Hello-World", "issue": "issue", "issue_num": "5"},
+        ),
+        ("summarize octocat/Hello-World issue 5abc", {"sum_repo": "octocat/Hello-World", "issue": "issue"}),
+        ("summarize octocat/Hello-World issues", {"sum_repo": "octocat/Hello-World"}),
+        ("what is octocat up to?", None),
+    ],
+)
+def test_cmd_re(text: str, groups: dict[str, str] | None) -> None:
+    """
+    Test the SMS command grammar.
+
+    Asserts:
+        - Each command fills only the named groups that select it.
+        - Text that is not a command does not match, so it goes to natural language routing.
+    """
+    from main import CMD_RE
+
+    match = CMD_RE.fullmatch(text)
+
+    if groups is None:
+        assert match is None
+    else:
+        assert match is not None
+        assert {name: value for name, value in match.groupdict().items() if value is not None} == groups
+
+
+@pytest.mark.usefixtures("summarizers")
+def test_webhook_summarize_issue(mocker) -> None:
+    """
+    Test a summarize command through the webhook.
+
+    Asserts:
+        - The repo and issue number are passed to the summarizer.
+        - The summary is escaped into the TwiML reply.
+    """
+    import main
+
+    summarize = mocker.patch.object(main, "summarize_specific_issue", return_value="Fixed in #6 & released.")
+
+    response = TestClient(main.app).post(
+        "/webhook", data={"From": "+15555550100", "Body": "summarize octocat/Hello-World issue 5"}
+    )
+
+    summarize.assert_awaited_once_with("octocat/Hello-World", 5)
+    assert b"<Message>Fixed in #6 &amp; released.</Message>" in response.content
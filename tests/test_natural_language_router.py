@@ -0,0 +1,120 @@
+"""Test natural language routing."""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+
+def mock_model_reply(mocker, router, intent: dict[str, str | None]) -> None:
+    """Make the Azure client answer with the given intent after yielding to the event loop."""
+    response = mocker.MagicMock()
+    response.choices[0].message.content = orjson.dumps(intent).decode()
+
+    async def complete(**_) -> object:
+        await asyncio.sleep(0)
+        return response
+
+    mocker.patch.object(router, "get_azure_chat_client_async").return_value.complete = complete
+
+
+@pytest.mark.usefixtures("summarizers")
+def test_parse_command_naturally_uses_search_when_model_names_no_repo(mocker) -> None:
+    """
+    Test that the speculative search fills in a repo the model did not name.
+
+    Asserts:
+        - The search runs on the user's text.
+        - Its result is used as the repo.
+    """
+    import natural_language_router as router
+
+    mock_model_reply(mocker, router, {"action": "summarize_repo", "repo": None})
+    search = mocker.patch.object(router, "github_search_repo", return_value="iiab/iiab")
+
+    parsed = asyncio.run(router.parse_command_naturally("What is internet in a box?", "openai/gpt-4o"))
+
+    search.assert_awaited_once_with("What is internet in a box?")
+    assert parsed["repo"] == "iiab/iiab"
+
+
+@pytest.mark.usefixtures("summarizers")
+def test_parse_command_naturally_cancels_search_when_model_names_repo(mocker) -> None:
+    """
+    Test that the speculative search is discarded when the model names a repo.
+
+    Asserts:
+        - The model's repo is kept.
+        - The search task is cancelled without raising.
+    """
+    import natural_language_router as router
+
+    async def never_finishes(_query: str) -> str:
+        await asyncio.sleep(3600)
+        return "someone/else"
+
+    mock_model_reply(mocker, router, {"action": "create_issue", "repo": "vercel/next.js"})
+    mocker.patch.object(router, "github_search_repo", side_effect=never_finishes)
+    create_task = mocker.spy(asyncio, "create_task")
+
+    async def parse_and_settle() -> dict[str, str | None]:
+        parsed = await router.parse_command_naturally("I want to file a bug in next.js", "openai/gpt-4o")
+        await asyncio.sleep(0)
+        assert create_task.spy_return.cancelled()
+        return parsed
+
+    parsed = asyncio.run(parse_and_settle())
+
+    assert parsed["repo"] == "vercel/next.js"
+
+
+def two_loop_pick(items: list[dict[str, str]], query: str) -> str | None:
+    """Pick a search result with the original two-loop logic, for comparison.
+
+    Returns:
+        str | None: The chosen full name, or None if there are no results.
+    """
+    query_lower = query.lower()
+    for item in items:
+        if item["name"].lower() == query_lower or query_lower in item["full_name"].lower():
+            return item["full_name"]
+    for item in items:
+        if query_lower in (item.get("description") or "").lower() or query_lower in item["name"].lower():
+            return item["full_name"]
+    return items[0]["full_name"] if items else None
+
+
+WEAK = {"name": "cutlery", "full_name": "acme/cutlery", "description": "Forks and spoons"}
+SOFT = {"name": "tutorial", "full_name": "octocat/tutorial", "description": "Fork the spoon-knife demo"}
+STRONG = {"name": "Spoon-Knife", "full_name": "octocat/Spoon-Knife", "description": "Practice forking"}
+NAME_SUBSTRING = {"name": "spoon-knife-v2", "full_name": "octocat/spoon-knife-v2", "description": None}
+
+
+@pytest.mark.usefixtures("summarizers")
+@pytest.mark.parametrize(
+    ("items", "expected"),
+    [
+        ([WEAK, SOFT, STRONG], "octocat/Spoon-Knife"),
+        ([SOFT, NAME_SUBSTRING], "octocat/spoon-knife-v2"),
+        ([WEAK, SOFT], "octocat/tutorial"),
+        ([WEAK], "acme/cutlery"),
+        ([], None),
+    ],
+)
+def test_github_search_repo_match_priority(mocker, items: list[dict[str, str]], expected: str | None) -> None:
+    """
+    Test that search results are picked strong > soft > weak in a single pass.
+
+    Asserts:
+        - A strong match wins even when a soft match comes first.
+        - A name-substring match is a strong match, so dropping it from the soft test changes nothing.
+        - The pick matches the original two-loop logic.
+    """
+    import natural_language_router as router
+
+    mocker.patch.object(router, "github_get_async", return_value=httpx.Response(200, json={"items": items}))
+
+    picked = asyncio.run(router.github_search_repo("spoon-knife"))
+
+    assert picked == expected == two_loop_pick(items, "spoon-knife")
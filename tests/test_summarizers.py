@@ -1,18 +1,214 @@
 """Test summarizers."""
 
+import asyncio
+import base64
 
-def test_summarize_text(mocker) -> None:
+import httpx
+
+import commands
+
+
+def test_summarize_text(mocker, summarizers, openai_stream) -> None:
     """
     Test text summarization.
 
     Asserts:
         - The summary returned is as expected.
     """
-    mocker.patch("connections.get_openai_client")
-    mocker.patch("tiktoken.get_encoding")
-    from summarizers import summarize_any_repo
+    readme = base64.b64encode(b"# Hello World\nMy first repository on GitHub.").decode()
+    payloads = {
+        "https://api.github.com/repos/octocat/Hello-World": {
+            "name": "Hello-World",
+            "owner": {"login": "octocat"},
+            "description": "My first repo",
+        },
+        "https://api.github.com/repos/octocat/Hello-World/readme": {"content": readme},
+    }
+    mocker.patch.object(
+        commands.GITHUB_HTTP_ASYNC,
+        "send",
+        side_effect=lambda request: httpx.Response(200, json=payloads[str(request.url)], request=request),
+    )
+    encoder = mocker.patch.object(summarizers, "_ENCODER")
+    encoder.encode.return_value = [1, 2, 3]
+    openai_stream("This is ", "a summary.")
 
     repo_full_name = "octocat/Hello-World"
-    summary = summarize_any_repo(repo_full_name=repo_full_name)
+    summary = asyncio.run(summarizers.summarize_any_repo(repo_full_name=repo_full_name))
 
     assert summary == "This is a summary."
+
+
+def test_ask_openai_caches_summary(summarizers, openai_client, openai_stream) -> None:
+    """
+    Test that repeated prompts are answered from the summary cache.
+
+    Asserts:
+        - The model is only called once for the same prompt.
+        - The cached summary is returned on the second call.
+    """
+    openai_stream(" A cached ", "summary. ")
+
+    first = asyncio.run(summarizers.ask_openai("Summarize octocat/Spoon-Knife"))
+    second = asyncio.run(summarizers.ask_openai("Summarize octocat/Spoon-Knife"))
+
+    assert first == second == "A cached summary."
+    openai_client.chat.completions.create.assert_called_once()
+
+
+def test_ask_openai_stops_streaming_at_length_budget(summarizers, openai_client, openai_stream) -> None:
+    """
+    Test that a long streamed summary is cut off and trimmed to a full sentence.
+
+    Asserts:
+        - The stream is closed once the length budget is overrun.
+        - The summary fits the SMS budget and ends on a sentence.
+        - Without a sentence break, it fits the budget and ends on a whole word.
+        - The trimmed summary is what gets cached.
+    """
+    updates = openai_stream(*["This sentence is forty characters long. "] * 100)
+
+    summary = asyncio.run(summarizers.ask_openai("Summarize torvalds/linux"))
+    cached = asyncio.run(summarizers.ask_openai("Summarize torvalds/linux"))
+
+    assert next(updates, None) is not None
+    assert len(summary) <= summarizers.ASK_OPENAI_MAX_LENGTH
+    assert summary.endswith("long.")
+    assert cached == summary
+    openai_client.chat.completions.create.assert_called_once()
+
+    openai_stream(*["no sentence break in this run of words "] * 100)
+    unpunctuated = asyncio.run(summarizers.ask_openai("Summarize torvalds/subsurface"))
+
+    assert len(unpunctuated) <= summarizers.ASK_OPENAI_MAX_LENGTH
+    assert unpunctuated.endswith(("no", "sentence", "break", "in", "this", "run", "of", "words"))
+
+
+def test_clean_readme(summarizers) -> None:
+    """
+    Test README cleanup before tokenization.
+
+    Asserts:
+        - Badges, images, HTML and URLs are removed.
+        - Link text and paragraph breaks are kept.
+    """
+    readme = (
+        '<p align="center"><img src="logo.png"></p>\n'
+        "# Hello   World [![CI](https://img.shields.io/ci.svg)](https://ci.example.com)\n\n\n"
+        "See the [docs](https://docs.example.com) or visit https://example.com today.\n"
+        "![screenshot](data:image/png;base64,iVBORw0KGgo=)"
+    )
+
+    assert summarizers.clean_readme(readme) == "# Hello World\n\nSee the docs or visit today."
+
+
+def test_clean_readme_keeps_comparisons(summarizers) -> None:
+    """
+    Test that `<` and `>` in prose and code are not mistaken for HTML.
+
+    Asserts:
+        - Text between a stray `<` and a later `>` survives, even across paragraphs.
+        - CRLF line endings still separate paragraphs.
+    """
+    readme = "Use it if a < b:\r\n\r\n    x <= 5\r\n\r\n> Quoted tip\r\nmap -> list <br/>"
+
+    assert summarizers.clean_readme(readme) == "Use it if a < b:\n\nx <= 5\n\n> Quoted tip\nmap -> list"
+
+
+def test_summarize_any_repo_graphql(mocker, summarizers) -> None:
+    """
+    Test repo summarization from a single GraphQL query.
+
+    Asserts:
+        - The README from the GraphQL response is used in the prompt.
+        - No REST requests are made.
+    """
+    mocker.patch.object(
+        summarizers,
+        "github_graphql_async",
+        return_value={
+            "repository": {
+                "name": "Spoon-Knife",
+                "owner": {"login": "octocat"},
+                "description": "This repo is for demonstration purposes only.",
+                "stargazerCount": 13000,
+                "forkCount": 150000,
+                "primaryLanguage": {"name": "HTML"},
+                "readmeMd": {"text": "### Well hello there!\n\nFork me to practice."},
+                "readmeLower": None,
+                "readmeRst": None,
+            }
+        },
+    )
+    rest = mocker.patch.object(summarizers, "github_get_async")
+    encoder = mocker.patch.object(summarizers, "_ENCODER")
+    encoder.encode.return_value = [1, 2, 3]
+    ask_openai = mocker.patch.object(summarizers, "ask_openai", return_value="A GraphQL summary.")
+
+    summary = asyncio.run(summarizers.summarize_any_repo("octocat/Spoon-Knife"))
+
+    assert summary == "A GraphQL summary."
+    assert "Fork me to practice." in ask_openai.call_args.args[0]
+    assert "Stars: 13000" in ask_openai.call_args.args[0]
+    rest.assert_not_called()
+
+
+def test_summarize_any_repo_falls_back_to_rest(mocker, summarizers) -> None:
+    """
+    Test that a failed GraphQL request falls back to the REST endpoints.
+
+    Asserts:
+        - A GraphQL transport error does not fail the summary.
+        - The README is fetched over REST instead.
+    """
+    readme = base64.b64encode(b"Fork me to practice.").decode()
+    payloads = {
+        "https://api.github.com/repos/octocat/Spoon-Knife": {"name": "Spoon-Knife", "owner": {"login": "octocat"}},
+        "https://api.github.com/repos/octocat/Spoon-Knife/readme": {"content": readme},
+    }
+
+    def send(request: httpx.Request, **_) -> httpx.Response:
+        if str(request.url) == commands.GITHUB_GRAPHQL_URL:
+            err_msg = "timed out"
+            raise httpx.ConnectTimeout(err_msg, request=request)
+        return httpx.Response(200, json=payloads[str(request.url)], request=request)
+
+    mocker.patch.object(commands, "_GITHUB_TOKEN", "token")
+    mocker.patch.object(commands.GITHUB_HTTP_ASYNC, "send", side_effect=send)
+    encoder = mocker.patch.object(summarizers, "_ENCODER")
+    encoder.encode.return_value = [1, 2, 3]
+    ask_openai = mocker.patch.object(summarizers, "ask_openai", return_value="A REST summary.")
+
+    summary = asyncio.run(summarizers.summarize_any_repo("octocat/Spoon-Knife"))
+
+    assert summary == "A REST summary."
+    assert "Fork me to practice." in ask_openai.call_args.args[0]
+
+
+def test_select_paragraphs(mocker, summarizers) -> None:
+    """
+    Test relevance-based README paragraph selection.
+
+    Asserts:
+        - The opening paragraph and the paragraphs matching the query are kept in order.
+        - Paragraphs that do not fit the token limit are dropped, including an oversized opening one.
+    """
+    paragraphs = [
+        "# Spoon Knife",
+        "Changelog entries for every release since the very first one went out.",
+        "Install the spoon knife package with pip.",
+        "Contributors are listed alphabetically below.",
+        "Use the knife to practice forking.",
+    ]
+    tokens = [paragraph.split() for paragraph in paragraphs]
+
+    selected = summarizers.select_paragraphs(paragraphs, tokens, "Spoon-Knife fork practice", 20, mocker.Mock())
+    long_opening = ["A long opening paragraph that does not fit the limit.", paragraphs[-1]]
+    without_opening = summarizers.select_paragraphs(
+        long_opening, [paragraph.split() for paragraph in long_opening], "Spoon-Knife fork practice", 7, mocker.Mock()
+    )
+
+    assert (
+        selected == "# Spoon Knife\n\nInstall the spoon knife package with pip.\n\nUse the knife to practice forking."
+    )
+    assert without_opening == "Use the knife to practice forking."